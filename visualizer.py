@@ -1,5 +1,18 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import graphviz as gv
 
+log = logging.getLogger(__name__)
+
+
+def _quote(name):
+    """Quotes a state name or edge label as a DOT string."""
+    return '"' + str(name).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
 
 def visualize_dfa(dfa):
     """Visualizes a DFA using Graphviz.
@@ -17,27 +30,221 @@ def visualize_dfa(dfa):
         A Graphviz object representing the DFA.
     """
 
-    graph = gv.Digraph(format='png')  # Choose a suitable output format
+    # The same DFA is often drawn repeatedly, so its DOT source is cached
+    return gv.Source(_dfa_dot(_dfa_signature(dfa)), format='png')
 
-    # Add nodes for states, highlighting accepting states
-    for state in dfa['states']:
-        shape = 'doublecircle' if state in dfa['accept_states'] else 'circle'
-        state_name = str(state)
-        graph.node(state_name, shape=shape)
 
-    # Add edges for transitions
-    for (state, symbol), next_state in dfa['transitions'].items():
-        # Special handling for empty string
-        label = f"{symbol}" if symbol != 'λ' else 'ε'
-        current_state_name = str(state)
-        next_state_name = str(next_state)
-        graph.edge(current_state_name, next_state_name, label=label)
+@lru_cache(maxsize=64)
+def _dfa_dot(signature):
+    """Builds the DOT source of a DFA diagram.
+
+    Args:
+        signature: A DFA snapshot from `_dfa_signature`.
+
+    Returns:
+        The DOT source as a string.
+    """
+
+    states, accept_states, transitions, start_state = signature
+    lines = ['digraph {']
+    _emit_nodes(lines, states, accept_states, start_state)
+    # The edge labels come from the symbols the transitions use
+    _emit_edges(lines, dict(transitions),
+                [symbol for (_, symbol), _ in transitions], edges_are_lists=False)
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def _symbol_labels(symbols):
+    """Maps each input symbol to its edge label once, so edge loops do a
+    lookup instead of formatting every label. λ (the empty string) is
+    always included and drawn as ε."""
+    labels = {symbol: str(symbol) for symbol in symbols}
+    labels['λ'] = 'ε'
+    return labels
+
+
+def _node_id(state, prefix):
+    """Returns the quoted DOT node ID of a state, and a label attribute
+    naming it when the ID carries a prefix."""
+    if not prefix:
+        return _quote(state), ''
+    return _quote(f"{prefix}{state}"), f"label={_quote(state)} "
+
+
+class _NodeNames(dict):
+    """Maps states to their quoted DOT node IDs, quoting each state only
+    the first time it is looked up."""
+
+    def __init__(self, prefix=''):
+        super().__init__()
+        self.prefix = prefix
+
+    def __missing__(self, state):
+        node = self[state] = _node_id(state, self.prefix)[0]
+        return node
 
-    # Highlight the start state
-    graph.node(str(dfa['start_state']), shape='circle',
-               style='filled', fillcolor='lightblue')
 
-    return graph
+def _automaton_lines(automaton, prefix='', edges_are_lists=False):
+    """Returns the DOT statements drawing a DFA or an NFA.
+
+    Node IDs are prefixed with `prefix` so that several automata can share
+    one graph; the nodes are still labelled with the bare state names.
+
+    Args:
+        automaton: A dictionary representing the DFA (see `visualize_dfa`)
+            or the NFA (see `visualize_nfa`).
+        prefix: The prefix for node IDs.
+        edges_are_lists: Whether transitions map to lists of next states
+            (an NFA) rather than to a single next state (a DFA).
+
+    Returns:
+        A list of DOT statements.
+    """
+
+    lines = []
+    _emit_nodes(lines, automaton['states'], automaton['accept_states'],
+                automaton['start_state'], prefix)
+    _emit_edges(lines, automaton['transitions'], automaton['alphabet'],
+                edges_are_lists, prefix)
+    return lines
+
+
+def _emit_nodes(lines, states, accept_states, start_state, prefix='', fills=None):
+    """Appends the DOT node statements for a set of states to `lines`.
+
+    Accepting states are drawn as double circles and the start state is
+    filled, both in the state's single node statement. `fills` optionally
+    maps states to extra fill colors; a state with two fill colors (such as
+    a start state that is also colored) is split into wedges. States that
+    `fills` names but are not in `states` get a node too.
+    """
+
+    fill_of = {start_state: ['lightblue']}
+    for state, color in (fills or {}).items():
+        fill_of.setdefault(state, []).append(color)
+
+    def fill(state):
+        colors = fill_of.get(state)
+        if not colors:
+            return ''
+        if len(colors) == 1:
+            return f' style=filled fillcolor={colors[0]}'
+        return f' style=wedged fillcolor={_quote(":".join(colors))}'
+
+    accept_states = set(accept_states)
+    for state in states:
+        shape = 'doublecircle' if state in accept_states else 'circle'
+        node, label = _node_id(state, prefix)
+        lines.append(f'\t{node} [{label}shape={shape}{fill(state)}]')
+    for state in fill_of:
+        if state not in states:
+            node, label = _node_id(state, prefix)
+            lines.append(f'\t{node} [{label}shape=circle{fill(state)}]')
+
+
+def _emit_edges(lines, transitions, alphabet, edges_are_lists, prefix=''):
+    """Appends the DOT edge statements for a set of transitions to `lines`.
+
+    Transitions map (state, symbol) to a next state, or to a list of them
+    when `edges_are_lists`. Parallel edges are merged into one edge
+    labelled with all of their symbols.
+    """
+
+    name_of = _NodeNames(prefix)
+    label_of = _symbol_labels(alphabet)
+    edges = {}
+    for (state, symbol), target in transitions.items():
+        if edges_are_lists:
+            if not target:  # No next states, so nothing to draw
+                continue
+            next_states = target
+        else:
+            next_states = (target,)
+        label = label_of.get(symbol) or str(symbol)
+        for next_state in next_states:
+            edges.setdefault((state, next_state), []).append(label)
+    for (state, next_state), labels in edges.items():
+        lines.append(f'\t{name_of[state]} -> {name_of[next_state]} '
+                     f'[label={_quote(",".join(labels))}]')
+
+
+@lru_cache(maxsize=64)
+def _index_dfa(signature):
+    """Interns the states and symbols of a DFA as small integers.
+
+    Args:
+        signature: A DFA snapshot from `_dfa_signature`.
+
+    Returns:
+        A tuple (state_ids, symbol_ids, stride, delta, accepting):
+        - state_ids: A dictionary mapping each state to its index.
+        - symbol_ids: A dictionary mapping each input symbol used by a
+          transition to its index.
+        - stride: The length of one row of delta.
+        - delta: A flat tuple of rows of `stride` entries, one row per
+          state index. The entry at state_id * stride + symbol_id is the
+          row offset (index * stride) of the next state, or -1 when there
+          is no transition. Storing offsets rather than indices lets a run
+          step with a single addition and lookup. Each row ends with an
+          extra -1 entry, column stride - 1, which unknown symbols are
+          mapped to.
+        - accepting: A frozenset of the row offsets of the accepting states.
+    """
+
+    states, accept_states, transitions, start_state = signature
+    state_ids = {}
+    symbol_ids = {}
+    for state in states:
+        state_ids.setdefault(state, len(state_ids))
+    # States that only appear in transitions still get an index
+    state_ids.setdefault(start_state, len(state_ids))
+    for (state, symbol), next_state in transitions:
+        state_ids.setdefault(state, len(state_ids))
+        state_ids.setdefault(next_state, len(state_ids))
+        symbol_ids.setdefault(symbol, len(symbol_ids))
+
+    stride = len(symbol_ids) + 1
+    delta = [-1] * (stride * len(state_ids))
+    for (state, symbol), next_state in transitions:
+        delta[state_ids[state] * stride + symbol_ids[symbol]] = \
+            state_ids[next_state] * stride
+
+    accepting = frozenset(state_ids[state] * stride
+                          for state in accept_states if state in state_ids)
+
+    return state_ids, symbol_ids, stride, tuple(delta), accepting
+
+
+def run_dfa(delta, accepting, start, syms):
+    """Runs a DFA over a sequence of symbol indices.
+
+    Args:
+        delta: The flat transition table from `_index_dfa`.
+        accepting: The accepting row offsets from `_index_dfa`.
+        start: The row offset of the start state (its index * stride).
+        syms: A sequence of symbol indices, with stride - 1 (the trailing
+            -1 column of every row) for unknown symbols.
+
+    Returns:
+        A tuple containing:
+        - The list of visited row offsets, starting with `start`. It is
+          shorter than len(syms) + 1 when the run hits a missing transition.
+        - A boolean indicating whether the whole input was consumed and the
+          run ended in an accepting state.
+    """
+
+    path = [start]
+    append = path.append
+    state = start
+    # An unknown symbol lands on the trailing -1 entry of the current row,
+    # so a single check per step covers both ways the run can stop
+    for symbol in syms:
+        state = delta[state + symbol]
+        if state < 0:
+            return path, False
+        append(state)
+    return path, state in accepting
 
 
 def visualize_dfa_path(dfa, s):
@@ -60,49 +267,81 @@ def visualize_dfa_path(dfa, s):
         - A list of states in the path.
     """
 
-    accepted = True
+    # The integer tables and edges only depend on the DFA, so they are
+    # built once per DFA and looked up by its signature
+    signature = _dfa_signature(dfa)
+
+    # Create a DFA path for the string, stepping through the integer tables
+    state_ids, symbol_ids, stride, delta, accepting = _index_dfa(signature)
+    state_of = list(state_ids)
 
-    # Create a DFA path for the string
-    current_state = dfa['start_state']
-    path = [current_state]
-    for symbol in s:
-        next_state = dfa['transitions'].get((current_state, symbol), None)
-        if next_state is None:
-            accepted = False
-            break
-        current_state = next_state
-        path.append(current_state)
+    syms = [symbol_ids.get(symbol, stride - 1) for symbol in s]
+    offset_path, accepted = run_dfa(delta, accepting,
+                                    state_ids[dfa['start_state']] * stride, syms)
+    path = [state_of[offset // stride] for offset in offset_path]
 
-    accepted = accepted and current_state in dfa['accept_states']
     accepted_color = 'green' if accepted else 'red'
 
     # Create a DFA path graph
-    graph = gv.Digraph(format='png')
+    lines = ['digraph {']
 
     # Add the string 's' at the top of the image
-    graph.node('s', label=s, shape='none', fontsize='20', fontweight='bold')
+    lines.append(f'\ts [label={_quote(s)} fontsize=20 fontweight=bold shape=none]')
 
-    # Highlight the start state
-    graph.node(dfa['start_state'], shape='circle',
-               style='filled', fillcolor='lightblue')
+    # Add nodes for states, highlighting accepting states and the start
+    # state, and coloring the last state in the path
+    _emit_nodes(lines, dfa['states'], dfa['accept_states'], dfa['start_state'],
+                fills={path[-1]: accepted_color})
 
-    # Add nodes for states, highlighting accepting states
-    for state in dfa['states']:
-        shape = 'doublecircle' if state in dfa['accept_states'] else 'circle'
-        if state == path[-1]:  # last state in the path
-            graph.node(state, shape=shape, style='filled',
-                       fillcolor=accepted_color)
-        else:
-            graph.node(state, shape=shape)
+    # Add edges for transitions, highlighting the path; a merged edge is on
+    # the path when any of its transitions is
+    # Only the transitions actually taken: a run that stopped early must
+    # not pair its last state with the symbol it could not consume
+    path_edges = set(zip(path[:-1], s[:len(path) - 1]))
+    for keys, from_id, to_id, label in _dfa_path_edges(signature):
+        on_path = not path_edges.isdisjoint(keys)
+        color = accepted_color if on_path else 'black'
+        lines.append(f'\t{from_id} -> {to_id} [label={label} color={color}]')
+
+    lines.append('}')
+    return gv.Source('\n'.join(lines), format='png'), accepted, path
+
+
+def _dfa_signature(dfa):
+    """Returns a hashable snapshot of the parts of a DFA that get drawn."""
+    return (tuple(dfa['states']), frozenset(dfa['accept_states']),
+            tuple(dfa['transitions'].items()), dfa['start_state'])
+
+
+@lru_cache(maxsize=64)
+def _dfa_path_edges(signature):
+    """Prebuilds the input-independent edges of a DFA path diagram.
 
-    # Add edges for transitions
-    for (state, symbol), next_state in dfa['transitions'].items():
-        # Special handling for empty string
-        label = f"{symbol}" if symbol != 'λ' else 'ε'
-        graph.edge(state, next_state, label=label, color=accepted_color if (
-            state, symbol) in zip(path, s) else 'black')  # Highlight the path
+    Args:
+        signature: A DFA snapshot from `_dfa_signature`.
+
+    Returns:
+        A tuple of (keys, from_id, to_id, label) tuples, one per merged
+        edge, where keys are the (state, symbol) transitions it draws,
+        from_id and to_id are the quoted node IDs of its ends and label is
+        its quoted label.
+    """
+
+    transitions = signature[2]
+    name_of = _NodeNames()
 
-    return graph, accepted, path
+    # Add edges for transitions, merging parallel edges
+    merged = {}
+    for (state, symbol), next_state in transitions:
+        merged.setdefault((state, next_state), []).append(symbol)
+    label_of = _symbol_labels(symbol for (_, symbol), _ in transitions)
+    edges = []
+    for (state, next_state), symbols in merged.items():
+        label = ','.join(label_of[symbol] for symbol in symbols)
+        edges.append((tuple((state, symbol) for symbol in symbols),
+                      name_of[state], name_of[next_state], _quote(label)))
+
+    return tuple(edges)
 
 
 def visualize_nfa(nfa):
@@ -121,47 +360,137 @@ def visualize_nfa(nfa):
         A Graphviz object representing the NFA.
     """
 
-    graph = gv.Digraph(format='png')  # Choose a suitable output format
+    # Write the DOT source directly; one string join is much cheaper than a
+    # Digraph.node()/edge() call (with its attribute quoting) per element
+    lines = ['digraph {', *_automaton_lines(nfa, edges_are_lists=True), '}']
+    return gv.Source('\n'.join(lines), format='png')
 
-    # Add nodes for states, highlighting accepting states
-    for state in nfa['states']:
-        shape = 'doublecircle' if state in nfa['accept_states'] else 'circle'
-        graph.node(state, shape=shape)
 
-    # Add edges for transitions, handling multiple next states
-    for (state, symbol), next_states in nfa['transitions'].items():
-        # Special handling for empty string
-        label = f"{symbol}" if symbol != 'λ' else 'ε'
-        for next_state in next_states:
-            # Create edges for all next states
-            graph.edge(state, next_state, label=label)
+def visualize_nfa_and_dfa(nfa, dfa):
+    """Visualizes an NFA next to its equivalent DFA in a single graph.
+
+    Both automata are drawn as clusters of one DOT document, so a single
+    `dot` run lays out the pair.
 
-    # Highlight the start state
-    graph.node(nfa['start_state'], shape='circle',
-               style='filled', fillcolor='lightblue')
+    Args:
+        nfa: A dictionary representing the NFA (see `visualize_nfa`).
+        dfa: A dictionary representing the DFA (see `visualize_dfa`).
+
+    Returns:
+        A Graphviz object representing both automata.
+    """
 
-    return graph
+    lines = ['digraph {',
+             '\tsubgraph cluster_nfa {', '\t\tlabel="NFA"',
+             *('\t' + line for line in _automaton_lines(
+                 nfa, prefix='nfa_', edges_are_lists=True)), '\t}',
+             '\tsubgraph cluster_dfa {', '\t\tlabel="DFA"',
+             *('\t' + line for line in _automaton_lines(dfa, prefix='dfa_')), '\t}',
+             '}']
+    return gv.Source('\n'.join(lines), format='png')
 
 
 def calculate_epsilon_closures(nfa):
 
+    transitions = nfa['transitions']
+    # Closures are int bitmasks: bit i is set when the state numbered i by
+    # the search below is in the closure, so merging is a single |=
+    closures = {}
+
+    # Tarjan's algorithm over the epsilon edges only. Components come off the
+    # stack sinks-first, so every component reachable from the current one
+    # already has its closure and can simply be merged in.
+    index = {}
+    low = {}
+    scc_stack = []
+    on_stack = set()
+    for root in nfa['states']:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        scc_stack.append(root)
+        on_stack.add(root)
+        # Explicit DFS stack of (state, iterator over its epsilon successors)
+        work = [(root, iter(transitions.get((root, 'λ'), ())))]
+        while work:
+            state, successors = work[-1]
+            for next_state in successors:
+                if next_state not in index:
+                    index[next_state] = low[next_state] = len(index)
+                    scc_stack.append(next_state)
+                    on_stack.add(next_state)
+                    work.append((next_state, iter(
+                        transitions.get((next_state, 'λ'), ()))))
+                    break
+                if next_state in on_stack:
+                    low[state] = min(low[state], index[next_state])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[state])
+                if low[state] != index[state]:
+                    continue
+
+                # state is the root of a component: pop its members
+                members = []
+                while True:
+                    member = scc_stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == state:
+                        break
+
+                # Closure = the component plus the closures it points into
+                closure = 0
+                for member in members:
+                    closure |= 1 << index[member]
+                for member in members:
+                    for next_state in transitions.get((member, 'λ'), ()):
+                        if next_state in closures:
+                            closure |= closures[next_state]
+                for member in members:
+                    closures[member] = closure
+
+    # Decode each distinct bitmask once into a frozenset of state names,
+    # lowest bit first; the states of one component share that object
+    names = list(index)
+    decoded = {}
     epsilon_closures = {}
     for state in nfa['states']:
-        epsilon_closures[state] = set()
-        visited = set()
-        stack = [state]
-        while stack:
-            current_state = stack.pop()
-            if current_state in visited:
-                continue
-            visited.add(current_state)
-            epsilon_closures[state].add(current_state)
-            for next_state in nfa['transitions'].get((current_state, 'λ'), []):
-                stack.append(next_state)
+        bits = closures[state]
+        closure = decoded.get(bits)
+        if closure is None:
+            members = []
+            while bits:
+                low_bit = bits & -bits
+                members.append(names[low_bit.bit_length() - 1])
+                bits ^= low_bit
+            closure = decoded[closures[state]] = frozenset(members)
+        epsilon_closures[state] = closure
 
     return epsilon_closures
 
 
+def get_epsilon_closures(nfa):
+    """Returns the epsilon closures of an NFA, computing them only once.
+
+    The closures are stored on the NFA under 'epsilon_closures' the first
+    time they are needed, so later callers read the field directly.
+
+    Args:
+        nfa: A dictionary representing the NFA.
+
+    Returns:
+        A dictionary mapping each state to its epsilon closure.
+    """
+
+    closures = nfa.get('epsilon_closures')
+    if closures is None:
+        closures = nfa['epsilon_closures'] = calculate_epsilon_closures(nfa)
+    return closures
+
+
 def visualize_e_nfa(nfa):
     """Visualizes an Epsilon Closure NFA using Graphviz.
 
@@ -174,32 +503,66 @@ def visualize_e_nfa(nfa):
             - 'start_state': The start state.
             - 'accept_states': A list of accepting states.
             - 'epsilon_closures': A dictionary mapping each state to its epsilon closure
-              (a set of states reachable through epsilon transitions).
+              (a frozenset of states reachable through epsilon transitions).
 
     Returns:
         A Graphviz object representing the NFA.
     """
 
-    graph = gv.Digraph(format='png')  # Choose a suitable output format
+    # Same drawing as a plain NFA; ε-edges are labelled by _automaton_lines
+    return visualize_nfa(nfa)
 
-    # Add nodes for states, highlighting accepting states
+
+def _compact(nfa):
+    """Flattens an NFA's transitions into a dense table indexed by ids.
+
+    Args:
+        nfa: A dictionary representing the NFA.
+
+    Returns:
+        A tuple (state_ids, symbol_ids, bit_of, table). state_ids and
+        symbol_ids number the states and symbols from 0, alphabet first,
+        bit_of maps each state to its bit (1 << state_id), and
+        table[state_id][symbol_id] is the bitmask of next state ids.
+    """
+
+    state_ids = {}
     for state in nfa['states']:
-        shape = 'doublecircle' if state in nfa['accept_states'] else 'circle'
-        graph.node(state, shape=shape)
+        state_ids.setdefault(state, len(state_ids))
+    state_ids.setdefault(nfa['start_state'], len(state_ids))
+    symbol_ids = {}
+    for symbol in nfa['alphabet']:
+        symbol_ids.setdefault(symbol, len(symbol_ids))
+    for (state, symbol), next_states in nfa['transitions'].items():
+        symbol_ids.setdefault(symbol, len(symbol_ids))
+        for nfa_state in (state, *next_states):
+            state_ids.setdefault(nfa_state, len(state_ids))
 
-    # Add edges for transitions, handling multiple next states
+    # Shift each state's bit once rather than once per use
+    bit_of = {state: 1 << state_id for state, state_id in state_ids.items()}
+
+    table = [[0] * len(symbol_ids) for _ in state_ids]
     for (state, symbol), next_states in nfa['transitions'].items():
-        # Special handling for empty string
-        label = f"{symbol}" if symbol != 'λ' else 'ε'
+        mask = 0
         for next_state in next_states:
-            # Create edges for all next states
-            graph.edge(state, next_state, label=label)
+            mask |= bit_of[next_state]
+        table[state_ids[state]][symbol_ids[symbol]] = mask
+
+    return state_ids, symbol_ids, bit_of, table
+
 
-    # Highlight the start state
-    graph.node(nfa['start_state'], shape='circle',
-               style='filled', fillcolor='lightblue')
+# The empty subset of NFA states: once a run reaches it, nothing is accepted
+_DEAD = 0
 
-    return graph
+
+def _excel_label(i):
+    """Returns the i-th spreadsheet-style column label: A, ..., Z, AA, ..."""
+    label = ''
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        label = chr(ord('A') + r) + label
+    return label
 
 
 def convert_nfa_to_dfa(nfa):
@@ -217,65 +580,206 @@ def convert_nfa_to_dfa(nfa):
     Returns:
         A dictionary representing the DFA.
     """
+    # Subsets of NFA states are int bitmasks: bit i is set when NFA state
+    # i is in the subset
+    state_ids, symbol_ids, bit_of, table = _compact(nfa)
+
+    accept_mask = 0
+    for state in nfa['accept_states']:
+        accept_mask |= bit_of.get(state, 0)
+
     dfa = {
         'states': [],
         'alphabet': nfa['alphabet'],
         'transitions': {},
-        # frozenset for immutability
-        'start_state': frozenset([nfa['start_state']]),
+        'start_state': 0,
         'accept_states': [],
     }
 
-    unprocessed_states = [dfa['start_state']]
-    processed_states = set()
-
-    while unprocessed_states:
-        current_dfa_state = unprocessed_states.pop()
-        processed_states.add(current_dfa_state)
+    # Each discovered subset is interned as a dense id, its index in
+    # `subsets`; `seen` maps a subset back to its id. Subsets are numbered
+    # breadth-first, so walking `subsets` in order is the BFS worklist and
+    # the start subset is always id 0
+    start_subset = bit_of[nfa['start_state']]
+    subsets = [start_subset]
+    seen = {start_subset: 0}
+    if start_subset & accept_mask:
+        dfa['accept_states'].append(0)
+    # The dead state's id, once some move has led to it
+    dead_id = None
+
+    # `subsets` grows while it is walked, so this visits every subset
+    for current_id, current_dfa_state in enumerate(subsets):
+        # The dead state is never expanded, since it can only loop on itself
+        if current_dfa_state == _DEAD:
+            continue
+
+        for symbol in nfa['alphabet']:
+            symbol_id = symbol_ids[symbol]
+            # Union the targets of every NFA state in the subset, visiting
+            # the set bits lowest first
+            next_dfa_state = 0
+            bits = current_dfa_state
+            while bits:
+                low_bit = bits & -bits
+                next_dfa_state |= table[low_bit.bit_length() - 1][symbol_id]
+                bits ^= low_bit
+
+            if next_dfa_state == _DEAD:
+                # Every dead move shares one sink, registered on first use;
+                # it is never accepting, so no lookup or test is needed
+                if dead_id is None:
+                    dead_id = len(subsets)
+                    subsets.append(_DEAD)
+                next_id = dead_id
+            else:
+                next_id = seen.get(next_dfa_state)
+                if next_id is None:
+                    next_id = seen[next_dfa_state] = len(subsets)
+                    subsets.append(next_dfa_state)
+                    # Test acceptance once, when the subset is first discovered
+                    if next_dfa_state & accept_mask:
+                        dfa['accept_states'].append(next_id)
+
+            dfa['transitions'][(current_id, symbol)] = next_id
+
+    dfa['states'] = list(range(len(subsets)))
+
+    # Convert state ids to alphabet labels (A, ..., Z, AA, AB, ...)
+    state_to_alphabet = [_excel_label(i) for i in range(len(subsets))]
+
+    # Decoding every subset is only worth it when the debug log is shown
+    if log.isEnabledFor(logging.DEBUG):
+        names = list(state_ids)
+        log.debug("DFA subsets: %s", {
+            state_to_alphabet[i]: [name for j, name in enumerate(names)
+                                   if subset >> j & 1]
+            for i, subset in enumerate(subsets)})
 
-        for symbol in dfa['alphabet']:
-            next_states = set()
-
-            for nfa_state in current_dfa_state:
-                next_states |= set(
-                    nfa['transitions'].get((nfa_state, symbol), []))
-
-            next_dfa_state = frozenset(next_states)
-
-            if next_dfa_state not in processed_states.union(unprocessed_states):
-                unprocessed_states.append(next_dfa_state)
-
-            dfa['transitions'][(current_dfa_state, symbol)] = next_dfa_state
+    dfa['start_state'] = state_to_alphabet[dfa['start_state']]
+    dfa['accept_states'] = [state_to_alphabet[state]
+                            for state in dfa['accept_states']]
+    dfa['states'] = state_to_alphabet
 
-            if any(state in nfa['accept_states'] for state in next_dfa_state):
-                dfa['accept_states'].append(next_dfa_state)
+    # Replace states in transitions by alphabet labels in one pass
+    label = state_to_alphabet
+    dfa['transitions'] = {(label[state], symbol): label[next_state]
+                          for (state, symbol), next_state
+                          in dfa['transitions'].items()}
 
-    dfa['states'] = list(processed_states)
+    log.debug("DFA: %s", dfa)
 
-    print("DFA: ", dfa)
+    return dfa
 
-    # Convert frozenset states to alphabet labels
-    state_to_alphabet = {}
-    for i, state in enumerate(dfa['states']):
-        alphabet_label = chr(ord('A') + i)
-        state_to_alphabet[state] = alphabet_label
 
-    dfa['start_state'] = state_to_alphabet[dfa['start_state']]
-    dfa['accept_states'] = [state_to_alphabet[state]
-                            for state in dfa['accept_states']]
-    dfa['states'] = [state_to_alphabet[state] for state in dfa['states']]
+def minimize_dfa(dfa):
+    """Minimizes a DFA with Hopcroft's partition refinement.
 
-    # Replace states in transitions by alphabet labels
-    new_transitions = {}
-    for (state, symbol), next_state in dfa['transitions'].items():
-        new_transitions[(state_to_alphabet[state], symbol)
-                        ] = state_to_alphabet[next_state]
+    Args:
+        dfa: A dictionary representing the DFA, with the following structure:
+            - 'states': A list of states.
+            - 'alphabet': A list of input symbols.
+            - 'transitions': A dictionary of transitions, where keys are tuples
+              of (state, input symbol), and values are the next states.
+            - 'start_state': The start state.
+            - 'accept_states': A list of accepting states.
 
-    dfa['transitions'] = new_transitions
+    Returns:
+        A dictionary representing the minimal DFA. Each group of equivalent
+        states is named after its first member in dfa['states']. Unreachable
+        states and dead states (which can never reach an accepting state)
+        are dropped, so transitions into them become missing transitions.
+    """
 
-    print("\n New DFA: ", dfa)
+    transitions = dfa['transitions']
+    accept_states = set(dfa['accept_states'])
+    symbols = list(dict.fromkeys(
+        [*dfa['alphabet'], *(symbol for _, symbol in transitions)]))
+
+    # Missing transitions go to an implicit dead state, so the refinement
+    # works on a complete DFA
+    dead = object()
+
+    # Only states reachable from the start state matter. Each state's row of
+    # next states (one per symbol) is looked up once here and reused below
+    rows = {}
+    stack = [dfa['start_state']]
+    while stack:
+        state = stack.pop()
+        if state in rows:
+            continue
+        rows[state] = row = [transitions.get((state, symbol), dead)
+                             for symbol in symbols]
+        stack.extend(next_state for next_state in row
+                     if next_state is not dead and next_state not in rows)
+    states = [state for state in dfa['states'] if state in rows]
+    listed = set(states)
+    states += [state for state in rows if state not in listed]
+
+    inverse = {}
+    for state in states:
+        for symbol, next_state in zip(symbols, rows[state]):
+            inverse.setdefault((next_state, symbol), []).append(state)
+    for symbol in symbols:
+        inverse.setdefault((dead, symbol), []).append(dead)
+
+    # Start from {accepting, non-accepting} and split blocks by the preimage
+    # of a splitter block until no block can be split
+    initial = ([s for s in states if s in accept_states],
+               [s for s in states if s not in accept_states] + [dead])
+    blocks = [set(block) for block in initial if block]
+    block_of = {state: i for i, block in enumerate(blocks) for state in block}
+    worklist = set(range(len(blocks)))
+
+    # One scratch dict is cleared and reused for every (splitter, symbol)
+    # pair; only the sets that become new blocks are kept
+    touched = {}
+    while worklist:
+        splitter = blocks[worklist.pop()]
+        for symbol in symbols:
+            touched.clear()
+            for state in splitter:
+                for prev_state in inverse.get((state, symbol), ()):
+                    touched.setdefault(block_of[prev_state], set()).add(prev_state)
+
+            for i, inside in touched.items():
+                if len(inside) == len(blocks[i]):
+                    continue
+                outside = blocks[i] - inside
+                blocks[i] = inside
+                blocks.append(outside)
+                j = len(blocks) - 1
+                for state in outside:
+                    block_of[state] = j
+                if i in worklist:
+                    worklist.add(j)
+                else:
+                    worklist.add(i if len(inside) <= len(outside) else j)
+
+    # Name each block after its first member; states equivalent to the
+    # implicit dead state are dropped unless one of them is the start state
+    representative = {}
+    for state in states:
+        representative.setdefault(block_of[state], state)
+    dead_block = block_of[dead]
+    if block_of[dfa['start_state']] != dead_block:
+        representative.pop(dead_block, None)
+
+    minimal = {
+        'states': list(representative.values()),
+        'alphabet': dfa['alphabet'],
+        'transitions': {},
+        'start_state': representative[block_of[dfa['start_state']]],
+        'accept_states': [state for state in representative.values()
+                          if state in accept_states],
+    }
+    for state in minimal['states']:
+        for symbol, next_state in zip(symbols, rows[state]):
+            next_block = block_of[next_state]
+            if next_block in representative:
+                minimal['transitions'][(state, symbol)] = representative[next_block]
 
-    return dfa
+    return minimal
 
 
 def visualize_rg(rg):
@@ -293,19 +797,20 @@ def visualize_rg(rg):
         A Graphviz object representing the Regular Grammar.
     """
 
-    graph = gv.Digraph(format='png')  # Choose a suitable output format
+    lines = ['digraph {']
 
     # Add nodes for variables
     for variable in rg['variables']:
         shape = 'doublecircle' if variable == rg['start_variable'] else 'circle'
-        graph.node(variable, shape=shape)
+        lines.append(f'\t{_quote(variable)} [shape={shape}]')
 
     # Add edges for productions
     for variable, productions in rg['productions'].items():
         for production in productions:
-            graph.edge(variable, production)
+            lines.append(f'\t{_quote(variable)} -> {_quote(production)}')
 
-    return graph
+    lines.append('}')
+    return gv.Source('\n'.join(lines), format='png')
 
 
 def convert_rg_to_dfa(rg):
@@ -331,34 +836,46 @@ def convert_rg_to_dfa(rg):
         'accept_states': [],
     }
 
-    unprocessed_states = [dfa['start_state']]
-    processed_states = set()
+    # Index the productions once: (variable, terminal) -> the rest of the
+    # first production of that variable starting with that terminal
+    next_of = {}
+    for variable, productions in rg['productions'].items():
+        for production in productions:
+            if production:
+                next_of.setdefault((variable, production[0]), production[1:])
+
+    # Breadth-first, so the states come out level by level from the start
+    unprocessed_states = deque([dfa['start_state']])
+    # Every state ever queued, in discovery order; each one is processed
+    # exactly once, so one lookup answers "already queued or processed"
+    seen = {dfa['start_state']: None}
+    # Accepting states, in discovery order and without repeats
+    accepting = {}
 
     while unprocessed_states:
-        current_dfa_state = unprocessed_states.pop()
-        processed_states.add(current_dfa_state)
+        current_dfa_state = unprocessed_states.popleft()
 
         for symbol in dfa['alphabet']:
-            next_state = None
-            for variable, productions in rg['productions'].items():
-                for production in productions:
-                    if production[0] == symbol and variable == current_dfa_state:
-                        next_state = production[1:]
-                        break
-                if next_state:
-                    break
+            next_state = next_of.get((current_dfa_state, symbol))
 
-            if next_state not in processed_states.union(unprocessed_states):
+            # No production for this symbol: leave the transition missing
+            # rather than adding a None state to the worklist
+            if next_state is None:
+                continue
+
+            if next_state not in seen:
+                seen[next_state] = None
                 unprocessed_states.append(next_state)
 
             dfa['transitions'][(current_dfa_state, symbol)] = next_state
 
             if next_state == '':
-                dfa['accept_states'].append(current_dfa_state)
+                accepting[current_dfa_state] = None
 
-    dfa['states'] = list(processed_states)
+    dfa['states'] = list(seen)
+    dfa['accept_states'] = list(accepting)
 
-    print("DFA: ", dfa)
+    log.debug("DFA: %s", dfa)
 
     return dfa
 
@@ -386,6 +903,7 @@ def convert_dfa_to_rg(dfa):
         'start_variable': dfa['start_state'],
     }
 
+    accept_states = set(dfa['accept_states'])
     for state in dfa['states']:
         rg['productions'][state] = []
         for symbol in dfa['alphabet']:
@@ -395,7 +913,7 @@ def convert_dfa_to_rg(dfa):
             else:  # Empty transition
                 rg['productions'][state].append(symbol)
 
-        if state in dfa['accept_states']:  # Add epsilon production for final states
+        if state in accept_states:  # Add epsilon production for final states
             rg['productions'][state].append('ε')
 
     return rg
@@ -420,29 +938,42 @@ def visualize_pda(pda):
         A Graphviz object representing the PDA.
     """
 
-    # Increase the size of the graph
-    graph = gv.Digraph(format='png')
+    lines = ['digraph {']
+    name_of = _NodeNames()
 
-    # Add nodes for states, highlighting accepting states
-    for state in pda['states']:
-        shape = 'doublecircle' if state in pda['accept_states'] else 'circle'
-        graph.node(state, shape=shape)
+    # Add nodes for states, highlighting accepting states and the start state
+    _emit_nodes(lines, pda['states'], pda['accept_states'], pda['start_state'])
 
     # Add edges for transitions, handling multiple next states
     for (state, symbol, stack_top), next_states in pda['transitions'].items():
+        if not next_states:
+            continue
         for next_state, push_symbol in next_states:
             label = f"{symbol},{stack_top} | {push_symbol}"
-            graph.edge(state, next_state, label=label)
-
-    # Highlight the start state
-    graph.node(pda['start_state'], shape='circle',
-               style='filled', fillcolor='lightblue')
+            lines.append(f'\t{name_of[state]} -> {name_of[next_state]} '
+                         f'[label={_quote(label)}]')
 
-    return graph
+    lines.append('}')
+    return gv.Source('\n'.join(lines), format='png')
 
 
 if __name__ == '__main__':
 
+    # The diagrams are independent, so their dot runs overlap in a pool
+    render_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+    renders = []
+
+    def write_png(graph, filename):
+        # Pipe the PNG straight out of dot and write it ourselves, instead of
+        # render() writing, rendering and cleaning up a temporary .gv file
+        png = graph.pipe(format='png')
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(f'{filename}.png', 'wb') as f:
+            f.write(png)
+
+    def save_png(graph, filename):
+        renders.append(render_pool.submit(write_png, graph, filename))
+
     def test_dfa():
 
         dfa = {
@@ -463,21 +994,21 @@ if __name__ == '__main__':
         # 1) Visualize the DFA
         graph = visualize_dfa(dfa)
         # Render and save the diagram
-        graph.render('images/dfa/dfa_visualization', cleanup=True)
+        save_png(graph, 'images/dfa/dfa_visualization')
         print("\n✅ DFA visualization saved to images/dfa/dfa_visualization.png")
 
         # 2) Visualize the DFA path for a given string (rejected case)
         s = "1000101"
         graph, accepted, path = visualize_dfa_path(dfa, s)
         print(f"String: {s}, Accepted: {accepted}, Path: {path}")
-        graph.render('images/dfa/dfa_path_visualization1', cleanup=True)
+        save_png(graph, 'images/dfa/dfa_path_visualization1')
         print("\n✅ DFA path visualization saved to images/dfa/dfa_path_visualization1.png")
 
         # 3) Visualize the DFA path for a given string (accepted case)
         s = "0010111"
         graph, accepted, path = visualize_dfa_path(dfa, s)
         print(f"String: {s}, Accepted: {accepted}, Path: {path}")
-        graph.render('images/dfa/dfa_path_visualization2', cleanup=True)
+        save_png(graph, 'images/dfa/dfa_path_visualization2')
         print("\n✅ DFA path visualization saved to images/dfa/dfa_path_visualization2.png")
 
     def test_nfa():
@@ -499,14 +1030,14 @@ if __name__ == '__main__':
         # 1) Visualize the NFA
         graph = visualize_nfa(nfa)
         # Render and save the diagram
-        graph.render('images/nfa/nfa_visualization', cleanup=True)
+        save_png(graph, 'images/nfa/nfa_visualization')
         print("\n✅ NFA visualization saved to images/nfa/nfa_visualization.png")
 
         # 2) Convert the NFA to a DFA and visualize the result
         dfa = convert_nfa_to_dfa(nfa)
         graph = visualize_dfa(dfa)
         # Render and save the diagram
-        graph.render('images/nfa/conversion_to_dfa', cleanup=True)
+        save_png(graph, 'images/nfa/conversion_to_dfa')
 
     def test_e_nfa():
 
@@ -523,13 +1054,13 @@ if __name__ == '__main__':
             'accept_states': ['q2']
         }
 
-        # Calculate epsilon closures (optional, if not already provided in e_nfa)
-        e_nfa['epsilon_closures'] = calculate_epsilon_closures(e_nfa)
+        # Calculate epsilon closures (only if not already provided in e_nfa)
+        get_epsilon_closures(e_nfa)
         print(f"Epsilon closures: {e_nfa['epsilon_closures']}")
 
         # 1) Visualize the Epsilon NFA
         graph = visualize_e_nfa(e_nfa)
-        graph.render('images/e_nfa/epsilon_e_nfa_visualization', cleanup=True)
+        save_png(graph, 'images/e_nfa/epsilon_e_nfa_visualization')
         print("\n✅ Epsilon NFA visualization saved to images/e_nfa/epsilon_e_nfa_visualization.png")
 
     def test_rg():
@@ -547,14 +1078,14 @@ if __name__ == '__main__':
         # 1) Visualize the Regular Grammar
         graph = visualize_rg(rg)
         # Render and save the diagram
-        graph.render('images/rg/rg_visualization', cleanup=True)
+        save_png(graph, 'images/rg/rg_visualization')
         print("\n✅ Regular Grammar visualization saved to images/rg/rg_visualization.png")
 
         # 2) Convert the Regular Grammar to a DFA and visualize the result
         dfa = convert_rg_to_dfa(rg)
         graph = visualize_dfa(dfa)
         # Render and save the diagram
-        graph.render('images/rg/conversion_to_dfa', cleanup=True)
+        save_png(graph, 'images/rg/conversion_to_dfa')
         print(
             "\n✅ Conversion to DFA visualization saved to images/rg/conversion_to_dfa.png")
 
@@ -579,14 +1110,14 @@ if __name__ == '__main__':
         # 1) Visualize the DFA
         graph = visualize_dfa(dfa)
         # Render and save the diagram
-        graph.render('images/rg/dfa_visualization', cleanup=True)
+        save_png(graph, 'images/rg/dfa_visualization')
         print("\n✅ DFA visualization saved to images/rg/dfa_visualization.png")
 
         # 2) Convert the DFA to a Regular Grammar and visualize the result
         rg = convert_dfa_to_rg(dfa)
         graph = visualize_rg(rg)
         # Render and save the diagram
-        graph.render('images/rg/conversion_to_rg', cleanup=True)
+        save_png(graph, 'images/rg/conversion_to_rg')
         print("\n✅ Conversion to Regular Grammar visualization saved to images/rg/conversion_to_rg.png")
 
     def test_pda():
@@ -611,7 +1142,7 @@ if __name__ == '__main__':
         # 1) Visualize the PDA
         graph = visualize_pda(pda)
         # Render and save the diagram
-        graph.render('images/pda/pda_visualization', cleanup=True)
+        save_png(graph, 'images/pda/pda_visualization')
         print("\n✅ PDA visualization saved to images/pda/pda_visualization.png")
 
     test_dfa()
@@ -619,3 +1150,8 @@ if __name__ == '__main__':
     test_e_nfa()
     test_rg()
     test_pda()
+
+    # Wait for every render, re-raising the first error
+    for future in renders:
+        future.result()
+    render_pool.shutdown()